@@ -1,13 +1,30 @@
 """Base dataset transformer class for all Poverty NYC datasets."""
 
+import re
+import string
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import pandas as pd
-from datetime import datetime
 
 
 from src.config.models import DatasetConfig
 
+# Maps ASCII punctuation and whitespace to '_' in a single str.translate pass
+_PUNCT_TABLE = str.maketrans({c: '_' for c in string.punctuation + string.whitespace})
+_NON_WORD_RUN = re.compile(r'[^\w]+')
+_UNDERSCORE_RUN = re.compile(r'_+')
+
+
+def _to_snake_case(name: str) -> str:
+    """Lowercase a name and collapse runs of punctuation/whitespace to '_'."""
+    name = str(name).lower()
+    if name.isascii():
+        name = name.translate(_PUNCT_TABLE)
+    else:
+        # Unicode punctuation/whitespace is not in the lookup table
+        name = _NON_WORD_RUN.sub('_', name)
+    return _UNDERSCORE_RUN.sub('_', name).strip('_')
+
 
 class BaseDatasetTransformer(ABC):
     """
@@ -16,6 +33,10 @@ class BaseDatasetTransformer(ABC):
     All dataset transformers must inherit from this class and implement
     the required abstract methods.
     """
+
+    # Optional {source_column: target_column} mapping. Socrata fetches push it
+    # into the SoQL SELECT so columns arrive already renamed.
+    COLUMN_MAPPING: Optional[Dict[str, str]] = None
     
     def __init__(self, config: DatasetConfig):
         """
@@ -65,28 +86,28 @@ class BaseDatasetTransformer(ABC):
         Returns:
             DataFrame with metadata columns added
         """
-        df = df.copy()
-        df['dataset_id'] = self.dataset_id
-        df['ingestion_timestamp'] = datetime.now()
-        return df
+        # assign() only allocates the new columns instead of copying every block;
+        # one timestamp (naive UTC) is shared by the whole batch
+        return df.assign(
+            dataset_id=self.dataset_id,
+            ingestion_timestamp=pd.Timestamp.now(tz='UTC').tz_localize(None)
+        )
     
     def standardize_column_names(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Standardize column names to snake_case.
+
+        Punctuation and whitespace become underscores (runs collapsed,
+        leading/trailing ones stripped). The column labels of ``df`` are
+        replaced in place; the underlying data is not copied.
         
         Args:
             df: DataFrame with original column names
             
         Returns:
-            DataFrame with standardized column names
+            The same DataFrame with standardized column names
         """
-        df = df.copy()
-        df.columns = (
-            df.columns
-            .str.lower()
-            .str.replace(r'[^\w\s]', '', regex=True)
-            .str.replace(r'\s+', '_', regex=True)
-        )
+        df.columns = [_to_snake_case(col) for col in df.columns]
         return df
     
     def validate_required_columns(self, df: pd.DataFrame, required_columns: list) -> None:
@@ -115,6 +115,8 @@ class FoodSupplyGapTransformer(BaseDatasetTransformer):
             'indexes': [
                 {'name': 'idx_dataset_year', 'columns': ['dataset_id', 'year']},
                 {'name': 'idx_nta_code', 'columns': ['nta_code']},
+                # The food_gaps_cache refresh filters on the latest year
+                {'name': 'idx_food_supply_gaps_year', 'columns': ['year']},
                 {'name': 'idx_rank', 'columns': ['rank']}
             ]
         }
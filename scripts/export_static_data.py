@@ -21,6 +21,11 @@ OUTPUT_DIR = Path(__file__).parent.parent / "viz" / "public" / "data"
 def export_food_gaps(storage: DataStorage) -> dict:
     """Export food supply gaps as GeoJSON."""
     query = text("""
+        WITH latest AS (
+            SELECT *
+            FROM food_supply_gaps
+            WHERE year = (SELECT MAX(year) FROM food_supply_gaps)
+        )
         SELECT json_build_object(
             'type', 'FeatureCollection',
             'features', json_agg(
@@ -40,9 +45,8 @@ def export_food_gaps(storage: DataStorage) -> dict:
                 )
             )
         ) as geojson
-        FROM ntas_2020 n
-        LEFT JOIN food_supply_gaps f ON n.nta2020 = f.nta_code
-        WHERE f.year = (SELECT MAX(year) FROM food_supply_gaps)
+        FROM latest f
+        JOIN ntas_2020 n ON n.nta2020 = f.nta_code
     """)
     
     engine = storage.get_engine()
@@ -85,7 +85,10 @@ def ingest_dataset(
             elif dataset_config.source_type == 'url_download':
                 df_raw = fetcher.fetch_data(force=force)
             else:
-                df_raw = fetcher.fetch_from_api(filters=filters)
+                df_raw = fetcher.fetch_from_api(
+                    filters=filters,
+                    columns=parser.transformer.COLUMN_MAPPING
+                )
         elif source == 'csv':
             csv_path = settings.get_data_path('raw') / f"{dataset_entry.dataset_id}.csv"
             if not csv_path.exists() or force:
@@ -210,6 +213,20 @@ def ingest_all_datasets(
             continue
 
 
+def refresh_cache() -> None:
+    """
+    Create or refresh the food_gaps_cache materialized view without ingesting.
+
+    Needed once on databases ingested before the view existed, since the
+    /food-gaps endpoint reads from it.
+    """
+    storage = DataStorage()
+    try:
+        storage.refresh_geojson_cache()
+    finally:
+        storage.close()
+
+
 def main():
     """Main entry point."""
     parser = argparse.ArgumentParser(
@@ -231,12 +248,14 @@ Examples:
 
   # Download and use CSV instead of API
   python scripts/ingest_data.py --dataset food_supply_gap --source csv
+
+  # Create/refresh the /food-gaps cache view without ingesting
+  python scripts/ingest_data.py --refresh-cache
         """
     )
 
     parser.add_argument(
         '--dataset',
-        required=True,
         help='Dataset key from registry or "all" for all enabled datasets'
     )
 
@@ -265,8 +284,17 @@ Examples:
         help='Preview data without storing'
     )
 
+    parser.add_argument(
+        '--refresh-cache',
+        action='store_true',
+        help='Create or refresh the food_gaps_cache view used by /food-gaps'
+    )
+
     args = parser.parse_args()
 
+    if not args.dataset and not args.refresh_cache:
+        parser.error('--dataset is required unless --refresh-cache is given')
+
     # Parse filters if provided
     filters = None
     if args.filter:
@@ -280,12 +308,21 @@ Examples:
     try:
         if args.dataset == 'all':
             ingest_all_datasets(args.source, filters, args.force, args.dry_run)
-        else:
+        elif args.dataset:
             ingest_dataset(args.dataset, args.source, filters, args.force, args.dry_run)
     except Exception as e:
         logger.error(f"Ingestion failed: {e}")
         sys.exit(1)
 
+    # Ingesting a source table refreshes the cache already; this covers
+    # bootstrapping it on an existing database
+    if args.refresh_cache and not args.dry_run:
+        try:
+            refresh_cache()
+        except Exception as e:
+            logger.error(f"Cache refresh failed: {e}")
+            sys.exit(1)
+
 
 if __name__ == '__main__':
     main()
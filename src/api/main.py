@@ -1,10 +1,25 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
 from src.api.routes import router
+from src.ingestion.storage import DataStorage
 import os
 
-app = FastAPI(title="Poverty NYC API")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Share one pooled DataStorage across requests for the app's lifetime."""
+    app.state.storage = DataStorage(pool='queue')
+    # Build the engines up front rather than on the first request
+    app.state.storage.get_engine()
+    app.state.storage.get_async_engine()
+    yield
+    app.state.storage.close()
+    await app.state.storage.close_async()
+
+
+app = FastAPI(title="Poverty NYC API", lifespan=lifespan)
 origins = os.getenv("ALLOWED_ORIGINS", "http://localhost:5173").split(",")
 
 # Configure CORS
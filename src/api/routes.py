@@ -1,63 +1,148 @@
-from fastapi import APIRouter, HTTPException
+import hashlib
+import time
+from typing import Any, Dict, Optional, Set, Tuple
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
 from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncResult
 from src.ingestion.storage import DataStorage
 from src.utils.logger import get_logger
 
 router = APIRouter()
 logger = get_logger(__name__)
 
+# Features are precomputed by DataStorage.refresh_geojson_cache on ingest
+FOOD_GAPS_FEATURES_QUERY = "SELECT feature FROM food_gaps_cache"
+FEATURE_FETCH_SIZE = 500
+
+# Changes whenever food_gaps_cache is refreshed; used as the cache key and ETag
+FOOD_GAPS_VERSION_QUERY = """
+    SELECT MAX(last_ingestion)
+    FROM dataset_metadata
+    WHERE table_name IN ('food_supply_gaps', 'ntas_2020')
+"""
+
+# How long browsers/CDNs and the in-process cache may reuse a response
+FOOD_GAPS_MAX_AGE = 300
+GEOJSON_MEDIA_TYPE = "application/geo+json"
+
+# version -> (payload, expires_at); holds at most the latest version
+_food_gaps_cache: Dict[Any, Tuple[memoryview, float]] = {}
+# Versions a response is currently buffering for the cache; concurrent
+# misses for the same version stream without keeping a copy
+_food_gaps_filling: Set[Any] = set()
+
+
+def _json_text_response(content: Optional[str]) -> Response:
+    """Return JSON already serialized by Postgres, skipping any decode/encode pass."""
+    return Response(content if content is not None else 'null', media_type="application/json")
+
+
+def get_storage(request: Request) -> DataStorage:
+    """Return the app-wide DataStorage created in the lifespan handler."""
+    return request.app.state.storage
+
+
+def _etag_matches(etag: str, if_none_match: str) -> bool:
+    """Check If-None-Match with weak comparison (RFC 9110): W/ is ignored, * matches."""
+    for tag in if_none_match.split(','):
+        tag = tag.strip()
+        if tag == '*' or tag.removeprefix('W/') == etag:
+            return True
+    return False
+
+
+async def _stream_feature_collection(conn: AsyncConnection, result: AsyncResult, version: Any):
+    """
+    Yield a GeoJSON FeatureCollection from a streamed result of serialized features.
+
+    If no other response is already filling the cache for ``version``, the
+    payload is buffered while streaming and cached once the stream completes.
+    Closes the connection once the stream is exhausted.
+    """
+    buffer: Optional[bytearray] = None
+    if version not in _food_gaps_filling:
+        _food_gaps_filling.add(version)
+        buffer = bytearray()
+
+    try:
+        first = True
+        chunk = b'{"type":"FeatureCollection","features":['
+        async for rows in result.partitions():
+            features = ','.join(row[0] for row in rows).encode()
+            chunk += features if first else b',' + features
+            first = False
+            if buffer is not None:
+                buffer += chunk
+            yield chunk
+            chunk = b''
+        chunk += b']}'
+        if buffer is not None:
+            buffer += chunk
+        yield chunk
+
+        if buffer is not None:
+            _food_gaps_cache.clear()
+            # A view over the buffer avoids copying the payload a second time
+            _food_gaps_cache[version] = (
+                memoryview(buffer),
+                time.monotonic() + FOOD_GAPS_MAX_AGE
+            )
+    finally:
+        if buffer is not None:
+            _food_gaps_filling.discard(version)
+        await conn.close()
+
+
 @router.get("/food-gaps")
-async def get_food_gaps():
+async def get_food_gaps(request: Request, storage: DataStorage = Depends(get_storage)):
     """
     Get food supply gaps by NTA as GeoJSON.
+
+    Features are read from the food_gaps_cache materialized view and
+    streamed from a server-side cursor. On a cache miss one response per
+    version buffers the payload so it can be cached; concurrent misses
+    stream without buffering. Responses carry an ETag derived from the
+    last ingestion of the source tables: matching If-None-Match requests
+    get a 304, and recent payloads are served from memory.
     """
-    storage = DataStorage()
+    conn = None
     try:
-        engine = storage.get_engine()
-        
-        # Query to join NTA geometry with food gap data
-        # We use ST_AsGeoJSON to get the geometry as a JSON string
-        # We use json_build_object to construct the Feature properties
-        # We use json_build_object again to construct the Feature
-        # Finally we aggregate into a FeatureCollection
-        query = text("""
-            SELECT json_build_object(
-                'type', 'FeatureCollection',
-                'features', json_agg(
-                    json_build_object(
-                        'type', 'Feature',
-                        'geometry', ST_AsGeoJSON(n.geom)::json,
-                        'properties', json_build_object(
-                            'nta_code', n.nta2020,
-                            'nta_name', n.nta_name,
-                            'boro_name', n.boro_name,
-                            'year', f.year,
-                            'supply_gap_lbs', f.supply_gap_lbs,
-                            'food_insecure_pct', f.food_insecure_pct,
-                            'vulnerable_pop_score', f.vulnerable_pop_score,
-                            'unemployment_rate', f.unemployment_rate
-                        )
-                    )
-                )
-            ) as geojson
-            FROM ntas_2020 n
-            LEFT JOIN food_supply_gaps f ON n.nta2020 = f.nta_code
-            WHERE f.year = (SELECT MAX(year) FROM food_supply_gaps) -- Get latest data
-        """)
-        
-        with engine.connect() as conn:
-            result = conn.execute(query).scalar()
-            
-        return result
-        
+        conn = await storage.get_async_engine().connect()
+
+        version = (await conn.execute(text(FOOD_GAPS_VERSION_QUERY))).scalar()
+        etag = f'"{hashlib.md5(str(version).encode()).hexdigest()}"'
+        headers = {'ETag': etag, 'Cache-Control': f"public, max-age={FOOD_GAPS_MAX_AGE}"}
+
+        if _etag_matches(etag, request.headers.get('if-none-match', '')):
+            await conn.close()
+            return Response(status_code=304, headers=headers)
+
+        cached = _food_gaps_cache.get(version)
+        if cached is not None and cached[1] > time.monotonic():
+            await conn.close()
+            return Response(cached[0], media_type=GEOJSON_MEDIA_TYPE, headers=headers)
+
+        # stream() uses a server-side cursor: rows arrive in batches of yield_per
+        result = await conn.stream(
+            text(FOOD_GAPS_FEATURES_QUERY),
+            execution_options={'yield_per': FEATURE_FETCH_SIZE}
+        )
+
     except Exception as e:
         logger.error(f"Error fetching food gaps: {e}")
+        if conn is not None:
+            await conn.close()
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        storage.close()
+
+    return StreamingResponse(
+        _stream_feature_collection(conn, result, version),
+        media_type=GEOJSON_MEDIA_TYPE,
+        headers=headers
+    )
 
 @router.get("/poverty-by-zip")
-async def get_poverty_by_zip():
+def get_poverty_by_zip(storage: DataStorage = Depends(get_storage)):
     """Get poverty rates joined with ZCTA geometries."""
     # Note: We use ST_AsGeoJSON(geometry) because the column name in census_zctas_2020 is 'geometry'
     query = text("""
@@ -78,7 +163,7 @@ async def get_poverty_by_zip():
                     )
                 )
             )
-        ) as geojson
+        )::text as geojson
     FROM census_zctas_2020 z
     JOIN census_acs_income_poverty c ON z.zip_code = c.zip_code
     WHERE c.year = (SELECT MAX(year) FROM census_acs_income_poverty)
@@ -86,7 +171,6 @@ async def get_poverty_by_zip():
       AND c.median_household_income IS NOT NULL;
     """)
     
-    storage = DataStorage()
     try:
         engine = storage.get_engine()
         with engine.connect() as conn:
@@ -94,17 +178,15 @@ async def get_poverty_by_zip():
         
         # If result is None (no data), return empty FeatureCollection
         if not result:
-            return {"type": "FeatureCollection", "features": []}
+            result = '{"type": "FeatureCollection", "features": []}'
             
-        return result
+        return _json_text_response(result)
     except Exception as e:
         logger.error(f"Error fetching poverty data: {e}")
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        storage.close()
 
 @router.get("/rent-by-zip")
-async def get_rent_by_zip():
+def get_rent_by_zip(storage: DataStorage = Depends(get_storage)):
     """Get Zillow market-rate rents joined with ZCTA geometries."""
     query = text("""
     SELECT 
@@ -122,20 +204,17 @@ async def get_rent_by_zip():
                     )
                 )
             )
-        ) as geojson
+        )::text as geojson
     FROM census_zctas_2020 z
     JOIN zillow_zori r ON z.zip_code = r.zip_code
     WHERE r.rent_index IS NOT NULL;
     """)
     
-    storage = DataStorage()
     try:
         engine = storage.get_engine()
         with engine.connect() as conn:
             result = conn.execute(query).scalar()
-        return result
+        return _json_text_response(result)
     except Exception as e:
         logger.error(f"Error fetching rent data: {e}")
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        storage.close()
@@ -22,6 +22,13 @@ class ColumnSchema(BaseModel):
     description: Optional[str] = None
 
 
+class IndexSchema(BaseModel):
+    """Index definition."""
+    name: str
+    columns: List[str]
+    using: Optional[str] = None  # Index method, e.g. "GIST" (default: BTREE)
+
+
 class ValidationConfig(BaseModel):
     """Validation configuration."""
     allow_duplicates: bool = True
@@ -39,6 +46,7 @@ class DatasetSchemaConfig(BaseModel):
     """Dataset schema configuration."""
     table_name: str
     columns: Dict[str, ColumnSchema]
+    indexes: List[IndexSchema] = Field(default_factory=list)
 
 
 class CensusConfig(BaseModel):
@@ -118,6 +126,17 @@ class DatabaseConfig(BaseModel):
             return f"{base}?sslmode={self.sslmode}"
         return base
 
+    def get_async_connection_string(self) -> str:
+        """Get PostgreSQL connection string for the asyncpg driver."""
+        base = (
+            f"postgresql+asyncpg://{self.user}:{self.password}"
+            f"@{self.host}:{self.port}/{self.database}"
+        )
+        if self.sslmode:
+            # asyncpg takes ssl=<mode> rather than libpq's sslmode
+            return f"{base}?ssl={self.sslmode}"
+        return base
+
 
 class AppConfig(BaseModel):
     """Application configuration model."""
@@ -36,7 +36,8 @@ class NYCOpenDataFetcher:
     def fetch_from_api(
         self,
         filters: Optional[Dict[str, Any]] = None,
-        limit: Optional[int] = None
+        limit: Optional[int] = None,
+        columns: Optional[Dict[str, str]] = None
     ) -> pd.DataFrame:
         """
         Fetch data from SODA3 API using POST requests.
@@ -44,6 +45,8 @@ class NYCOpenDataFetcher:
         Args:
             filters: Optional filter parameters (e.g., {'year': 2023})
             limit: Optional limit on number of records per page
+            columns: Optional {source_column: alias} mapping; only these
+                columns are selected, already renamed (default: all columns)
 
         Returns:
             DataFrame with fetched data
@@ -61,7 +64,14 @@ class NYCOpenDataFetcher:
         logger.info(f"Fetching data from SODA3 API: {endpoint}")
 
         # Build SoQL query
-        soql_query = "SELECT *"
+        if columns:
+            select_list = [
+                src if src == alias else f"{src} AS {alias}"
+                for src, alias in columns.items()
+            ]
+            soql_query = "SELECT " + ", ".join(select_list)
+        else:
+            soql_query = "SELECT *"
 
         # Add WHERE clause if filters provided
         if filters:
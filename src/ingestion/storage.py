@@ -1,11 +1,16 @@
 """Data storage layer for PostgreSQL."""
 
-from typing import Dict, Any, Optional
+from io import StringIO
+from typing import Dict, Any, Iterator, List, Optional, Union
 from pathlib import Path
+import numpy as np
 import pandas as pd
-from sqlalchemy import create_engine, text, MetaData, Table, Column, String, Integer, DateTime, Numeric, Index, UniqueConstraint
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import create_engine, inspect, text, MetaData, Table, Column, String, Integer, DateTime, Numeric, UniqueConstraint
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 from sqlalchemy.pool import NullPool
 from geoalchemy2 import Geometry
 
@@ -14,14 +19,70 @@ from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Connection pool sizing for long-lived processes such as the API
+POOL_OPTIONS = {'pool_size': 10, 'max_overflow': 20, 'pool_pre_ping': True}
+
+# Rows sent per executemany call when upserting
+UPSERT_BATCH_SIZE = 1000
+
+# Explicit NULL marker for COPY: in plain CSV mode an empty field is NULL, so
+# empty strings could not be told apart from missing values
+COPY_NULL = '\\N'
+COPY_OPTIONS = f"WITH (FORMAT csv, NULL '{COPY_NULL}')"
+
+# Tables whose ingestion invalidates the precomputed /food-gaps GeoJSON
+GEOJSON_CACHE_SOURCE_TABLES = ('food_supply_gaps', 'ntas_2020')
+
+# One serialized GeoJSON Feature per NTA for the latest food gap year
+FOOD_GAPS_CACHE_SQL = """
+    CREATE MATERIALIZED VIEW IF NOT EXISTS food_gaps_cache AS
+    WITH latest AS (
+        SELECT *
+        FROM food_supply_gaps
+        WHERE year = (SELECT MAX(year) FROM food_supply_gaps) -- Get latest data
+    )
+    SELECT
+        n.nta2020 AS nta_code,
+        f.dataset_id,
+        jsonb_build_object(
+            'type', 'Feature',
+            'geometry', ST_AsGeoJSON(ST_SimplifyPreserveTopology(n.geom, 0.00005))::jsonb,
+            'properties', jsonb_build_object(
+                'nta_code', n.nta2020,
+                'nta_name', n.nta_name,
+                'boro_name', n.boro_name,
+                'year', f.year,
+                'supply_gap_lbs', f.supply_gap_lbs,
+                'food_insecure_pct', f.food_insecure_pct,
+                'vulnerable_pop_score', f.vulnerable_pop_score,
+                'unemployment_rate', f.unemployment_rate
+            )
+        )::text AS feature
+    FROM latest f
+    JOIN ntas_2020 n ON n.nta2020 = f.nta_code
+"""
+
 
 class DataStorage:
     """Handles data storage to PostgreSQL database."""
 
-    def __init__(self):
-        """Initialize database connection."""
+    def __init__(self, pool: str = 'null'):
+        """
+        Initialize database connection.
+
+        Args:
+            pool: Connection pooling for the sync engine: 'null' opens a fresh
+                connection per checkout (ingestion jobs), 'queue' keeps a sized
+                pool of warm connections (the API)
+        """
+        if pool not in ('null', 'queue'):
+            raise ValueError(f"Invalid pool type: {pool}")
+
+        self.pool = pool
         self.connection_string = settings.config.database.get_connection_string()
+        self.async_connection_string = settings.config.database.get_async_connection_string()
         self.engine: Optional[Engine] = None
+        self.async_engine: Optional[AsyncEngine] = None
         self.metadata = MetaData()
 
     def get_engine(self) -> Engine:
@@ -33,13 +94,36 @@ class DataStorage:
         """
         if self.engine is None:
             logger.info("Creating database connection")
+            if self.pool == 'queue':
+                pool_kwargs = POOL_OPTIONS
+            else:
+                pool_kwargs = {'poolclass': NullPool}  # Use NullPool for simpler connection management
+
             self.engine = create_engine(
                 self.connection_string,
-                poolclass=NullPool,  # Use NullPool for simpler connection management
-                echo=False
+                echo=False,
+                **pool_kwargs
             )
         return self.engine
 
+    def get_async_engine(self) -> AsyncEngine:
+        """
+        Get or create async database engine (asyncpg) for API requests.
+
+        Ingestion keeps using the sync engine from get_engine().
+
+        Returns:
+            SQLAlchemy async engine
+        """
+        if self.async_engine is None:
+            logger.info("Creating async database connection")
+            self.async_engine = create_async_engine(
+                self.async_connection_string,
+                echo=False,
+                **POOL_OPTIONS
+            )
+        return self.async_engine
+
     def enable_postgis(self) -> None:
         """Enable PostGIS extension if not exists."""
         engine = self.get_engine()
@@ -70,12 +154,18 @@ class DataStorage:
 
         logger.info("Dataset metadata table created/verified")
 
-    def create_table_from_schema(self, schema: Dict[str, Any]) -> None:
+    def create_table_from_schema(self, schema: Dict[str, Any], concurrent: bool = False) -> None:
         """
         Create table from schema definition.
 
+        The table and its indexes are created in a single transaction.
+        Indexes use CREATE INDEX IF NOT EXISTS, so indexes added to a schema
+        are also built on tables that already exist.
+
         Args:
             schema: Schema dictionary from transformer
+            concurrent: Build indexes with CREATE INDEX CONCURRENTLY (outside
+                the transaction) so writes to an existing table aren't blocked
         """
         engine = self.get_engine()
         table_name = schema['table_name']
@@ -95,6 +185,15 @@ class DataStorage:
             'GEOMETRY': Geometry,
         }
 
+        # Geometry columns covered by a schema-declared GIST index skip
+        # geoalchemy2's automatic spatial index so it isn't created twice
+        gist_columns = {
+            col
+            for index_def in schema.get('indexes', [])
+            if (index_def.get('using') or '').upper() == 'GIST'
+            for col in index_def['columns']
+        }
+
         columns = []
         for col_name, col_def in schema['columns'].items():
             # Parse type string (e.g., "VARCHAR(20)" -> String(20))
@@ -117,7 +216,11 @@ class DataStorage:
                          if len(geom_args) > 1:
                              srid_str = geom_args[1].lower().replace('srid=', '').strip()
                              srid = int(srid_str)
-                         col_type = Geometry(geometry_type=geometry_type, srid=srid)
+                         col_type = Geometry(
+                             geometry_type=geometry_type,
+                             srid=srid,
+                             spatial_index=col_name not in gist_columns
+                         )
                     elif ',' in args:
                         arg_list = [int(a.strip()) for a in args.split(',')]
                         col_type = type_mapping[base_type](*arg_list)
@@ -146,14 +249,19 @@ class DataStorage:
 
             columns.append(Column(col_name, col_type, **kwargs))
 
-        # Add indexes to table definition
+        # Build index DDL, executed after the table is created
         schema_items = list(columns)
+        index_statements = []
         if 'indexes' in schema:
             for index_def in schema['indexes']:
                 index_name = index_def['name']
-                # We can use column names directly for Index inside Table
-                index_cols = index_def['columns']
-                schema_items.append(Index(index_name, *index_cols))
+                index_cols = ', '.join(index_def['columns'])
+                # Index method, e.g. GIST for geometry columns
+                using = index_def.get('using') or 'BTREE'
+                index_statements.append(
+                    f"CREATE INDEX {'CONCURRENTLY ' if concurrent else ''}IF NOT EXISTS "
+                    f"{index_name} ON {table_name} USING {using} ({index_cols})"
+                )
 
         # Add constraints to table definition
         if 'constraints' in schema:
@@ -177,8 +285,17 @@ class DataStorage:
             extend_existing=True
         )
 
-        # Create table (and indexes)
-        self.metadata.create_all(engine)
+        with engine.begin() as conn:
+            table.create(conn, checkfirst=True)
+            if not concurrent:
+                for index_sql in index_statements:
+                    conn.execute(text(index_sql))
+
+        if concurrent:
+            # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+            with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+                for index_sql in index_statements:
+                    conn.execute(text(index_sql))
 
         logger.info(f"Table {table_name} created/verified with indexes and constraints")
 
@@ -206,16 +323,19 @@ class DataStorage:
         logger.info(f"Storing {len(df)} records to table: {table_name}")
 
         try:
-            # Use pandas to_sql for simplicity
-            # For production, consider using COPY or bulk insert for better performance
-            df.to_sql(
-                table_name,
-                engine,
-                if_exists=if_exists,
-                index=False,
-                method='multi',
-                chunksize=1000
-            )
+            if if_exists == 'append' and inspect(engine).has_table(table_name):
+                # Appending to an existing table: COPY skips per-row SQL parsing
+                self._copy_bulk(df, table_name)
+            else:
+                # pandas to_sql handles table creation/replacement
+                df.to_sql(
+                    table_name,
+                    engine,
+                    if_exists=if_exists,
+                    index=False,
+                    method='multi',
+                    chunksize=1000
+                )
 
             # Update metadata table
             self._update_metadata(dataset_id, table_name, len(df))
@@ -227,6 +347,109 @@ class DataStorage:
             logger.error(f"Failed to store data: {e}")
             raise
 
+    def _copy_bulk(self, df: pd.DataFrame, table_name: str) -> None:
+        """
+        Bulk load a DataFrame into an existing table with COPY FROM STDIN.
+
+        Geometry columns are copied as text into a temporary staging table
+        and cast to geometry with INSERT ... SELECT, so WKT and hex WKB
+        values are both accepted.
+
+        Args:
+            df: DataFrame to load
+            table_name: Target table name
+        """
+        engine = self.get_engine()
+        table = Table(table_name, self.metadata, autoload_with=engine)
+
+        columns = list(df.columns)
+        column_list = ', '.join(f'"{col}"' for col in columns)
+        geometry_columns = {
+            col.name: col.type.srid
+            for col in table.c
+            if col.name in columns and isinstance(col.type, Geometry)
+        }
+
+        # COPY parses text strictly, so integer columns held as floats or
+        # objects (ints with NaN/None) must be written as "1" rather than "1.0"
+        integer_columns = {
+            col.name: self._to_nullable_int(df[col.name])
+            for col in table.c
+            if col.name in columns
+            and isinstance(col.type, Integer)
+            and not pd.api.types.is_integer_dtype(df[col.name])
+        }
+        if integer_columns:
+            df = df.assign(**integer_columns)
+
+        # Missing values are written as COPY_NULL so that empty strings stay
+        # empty strings instead of being read back as NULL
+        buffer = StringIO()
+        df.to_csv(buffer, index=False, header=False, na_rep=COPY_NULL)
+        buffer.seek(0)
+
+        conn = engine.raw_connection()
+        try:
+            with conn.cursor() as cur:
+                if geometry_columns:
+                    staging_table = f"{table_name}_staging"
+                    cur.execute(
+                        f'CREATE TEMP TABLE "{staging_table}" '
+                        f'(LIKE "{table_name}" INCLUDING DEFAULTS) ON COMMIT DROP'
+                    )
+                    for col in geometry_columns:
+                        cur.execute(
+                            f'ALTER TABLE "{staging_table}" ALTER COLUMN "{col}" TYPE TEXT'
+                        )
+                    cur.copy_expert(
+                        f'COPY "{staging_table}" ({column_list}) FROM STDIN {COPY_OPTIONS}',
+                        buffer
+                    )
+
+                    select_list = []
+                    for col in columns:
+                        srid = geometry_columns.get(col)
+                        if srid is None:
+                            select_list.append(f'"{col}"')
+                        elif srid > 0:
+                            select_list.append(f'ST_SetSRID("{col}"::geometry, {srid})')
+                        else:
+                            select_list.append(f'"{col}"::geometry')
+
+                    cur.execute(
+                        f'INSERT INTO "{table_name}" ({column_list}) '
+                        f'SELECT {", ".join(select_list)} FROM "{staging_table}"'
+                    )
+                else:
+                    cur.copy_expert(
+                        f'COPY "{table_name}" ({column_list}) FROM STDIN {COPY_OPTIONS}',
+                        buffer
+                    )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _to_nullable_int(series: pd.Series) -> pd.Series:
+        """
+        Convert a numeric Series to Int64 the way an INSERT would.
+
+        Postgres rounds numeric values to the nearest integer, halves away
+        from zero, when assigning them to an INTEGER column; COPY instead
+        rejects them, so they are rounded here first.
+
+        Args:
+            series: Series of numbers, numeric strings, or missing values
+
+        Returns:
+            Int64 Series with missing values as <NA>
+        """
+        values = pd.to_numeric(series).astype('float64')
+        return (np.sign(values) * np.floor(np.abs(values) + 0.5)).astype('Int64')
+
     def upsert_data(
         self,
         df: pd.DataFrame,
@@ -251,40 +474,38 @@ class DataStorage:
         logger.info(f"Upserting {len(df)} records to table: {table_name}")
 
         try:
-            # Convert DataFrame to list of dicts
-            records = df.to_dict('records')
-
-            if not records:
+            if df.empty:
                 return 0
 
-            with engine.connect() as conn:
-                # Reflect the table to get the Table object required by insert()
-                table = Table(table_name, self.metadata, autoload_with=engine)
-
-                # Use SQLAlchemy's PostgreSQL insert dialect for proper upsert handling
-                stmt = insert(table).values(records)
-
-                # Define what to do on conflict
-                # We want to update all columns except the unique keys
-                update_dict = {
-                    col.name: col
-                    for col in stmt.excluded
-                    if col.name not in unique_columns
-                }
-
-                if update_dict:
-                    upsert_stmt = stmt.on_conflict_do_update(
-                        index_elements=unique_columns,
-                        set_=update_dict
-                    )
-                else:
-                    # If no columns to update (e.g. only keys), do nothing
-                    upsert_stmt = stmt.on_conflict_do_nothing(
-                        index_elements=unique_columns
-                    )
+            # Reflect the table once to get the Table object required by insert()
+            table = Table(table_name, self.metadata, autoload_with=engine)
+
+            # Build a single parameterized statement and execute it with each
+            # batch of records (executemany) rather than inlining every row
+            stmt = insert(table)
+
+            # Define what to do on conflict
+            # We want to update all columns except the unique keys
+            update_dict = {
+                col.name: stmt.excluded[col.name]
+                for col in table.c
+                if col.name in df.columns and col.name not in unique_columns
+            }
+
+            if update_dict:
+                upsert_stmt = stmt.on_conflict_do_update(
+                    index_elements=unique_columns,
+                    set_=update_dict
+                )
+            else:
+                # If no columns to update (e.g. only keys), do nothing
+                upsert_stmt = stmt.on_conflict_do_nothing(
+                    index_elements=unique_columns
+                )
 
-                conn.execute(upsert_stmt)
-                conn.commit()
+            with engine.begin() as conn:
+                for batch in self._iter_record_batches(df, UPSERT_BATCH_SIZE):
+                    conn.execute(upsert_stmt, batch)
 
             # Update metadata
             self._update_metadata(dataset_id, table_name, len(df))
@@ -296,6 +517,40 @@ class DataStorage:
             logger.error(f"Failed to upsert data: {e}")
             raise
 
+    @staticmethod
+    def _iter_record_batches(
+        df: pd.DataFrame,
+        batch_size: int
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Yield DataFrame rows as lists of parameter dicts, one batch at a time.
+
+        Unlike df.to_dict('records'), only one batch of row dicts is alive at
+        a time. Columns are converted to object arrays once so values are
+        native Python types psycopg2 can adapt, with missing values as None.
+
+        Args:
+            df: DataFrame to convert
+            batch_size: Maximum rows per batch
+
+        Yields:
+            List of {column: value} dicts
+        """
+        columns = df.columns.tolist()
+        arrays = []
+        for col in columns:
+            array = df[col].to_numpy(dtype=object, copy=True)
+            # NaN/NaT/pd.NA would otherwise be sent as values rather than NULL
+            array[pd.isna(array)] = None
+            arrays.append(array)
+
+        for start in range(0, len(df), batch_size):
+            stop = start + batch_size
+            yield [
+                dict(zip(columns, values))
+                for values in zip(*(array[start:stop] for array in arrays))
+            ]
+
     def _update_metadata(self, dataset_id: str, table_name: str, record_count: int) -> None:
         """
         Update dataset metadata table.
@@ -307,6 +562,18 @@ class DataStorage:
         """
         engine = self.get_engine()
 
+        # Refresh before recording the ingestion: the API keys its response
+        # cache on last_ingestion, so it must not change ahead of the view.
+        # The data is already committed, so a failed refresh must not fail
+        # the ingest; it can be retried with ingest_data.py --refresh-cache
+        if table_name in GEOJSON_CACHE_SOURCE_TABLES:
+            try:
+                self.refresh_geojson_cache()
+            except Exception as e:
+                logger.error(
+                    f"Failed to refresh GeoJSON cache after loading {table_name}: {e}"
+                )
+
         with engine.connect() as conn:
             # Reflect the table
             metadata_table = Table('dataset_metadata', self.metadata, autoload_with=engine)
@@ -333,6 +600,42 @@ class DataStorage:
             conn.execute(upsert_stmt)
             conn.commit()
 
+    def refresh_geojson_cache(self) -> None:
+        """
+        Create or refresh the food_gaps_cache materialized view.
+
+        The view holds the /food-gaps features precomputed, so the API does
+        not repeat the join and GeoJSON serialization on every request.
+        Skipped until all source tables exist.
+        """
+        engine = self.get_engine()
+
+        inspector = inspect(engine)
+        missing_tables = [
+            table for table in GEOJSON_CACHE_SOURCE_TABLES
+            if not inspector.has_table(table)
+        ]
+        if missing_tables:
+            logger.info(f"Skipping GeoJSON cache refresh, missing tables: {missing_tables}")
+            return
+
+        view_exists = 'food_gaps_cache' in inspector.get_materialized_view_names()
+
+        with engine.begin() as conn:
+            # A newly created view is already populated by CREATE ... AS
+            conn.execute(text(FOOD_GAPS_CACHE_SQL))
+            # REFRESH ... CONCURRENTLY requires a unique index on the view
+            conn.execute(text(
+                "CREATE UNIQUE INDEX IF NOT EXISTS idx_food_gaps_cache_key "
+                "ON food_gaps_cache (nta_code, dataset_id)"
+            ))
+            if view_exists:
+                conn.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY food_gaps_cache"))
+
+        logger.info(
+            f"GeoJSON cache food_gaps_cache {'refreshed' if view_exists else 'created'}"
+        )
+
     def export_to_parquet(
         self,
         df: pd.DataFrame,
@@ -356,23 +659,30 @@ class DataStorage:
         logger.info(f"Exporting to Parquet: {output_path}")
 
         try:
-            # Create a copy to avoid modifying the original dataframe
-            df_export = df.copy()
-
-            # Convert WKTElement objects to string for Parquet compatibility
-            for col in df_export.columns:
-                if df_export[col].dtype == 'object':
-                    # Check if the first non-null value is a WKTElement
-                    first_valid = df_export[col].dropna().first_valid_index()
+            # Convert WKTElement/WKBElement objects to string for Parquet compatibility,
+            # replacing only those columns rather than copying the whole frame
+            geometry_columns = {}
+            for col in df.columns:
+                if df[col].dtype == 'object':
+                    # Check if the first non-null value is a geometry element
+                    first_valid = df[col].dropna().first_valid_index()
                     if first_valid is not None:
-                        val = df_export.loc[first_valid, col]
+                        val = df.loc[first_valid, col]
                         if hasattr(val, 'desc') or 'WKTElement' in str(type(val)):
-                            df_export[col] = df_export[col].astype(str)
-
-            df_export.to_parquet(
+                            geometry_columns[col] = df[col].astype(str)
+            df_export = df.assign(**geometry_columns) if geometry_columns else df
+
+            # Dictionary-encode repeated strings (borough names, NTA types, ...)
+            # and compress with ZSTD; statistics enable predicate pushdown on read
+            table = pa.Table.from_pandas(df_export, preserve_index=False)
+            pq.write_table(
+                table,
                 output_path,
-                compression='snappy',
-                index=False
+                compression='zstd',
+                compression_level=3,
+                use_dictionary=True,
+                data_page_size=1 << 20,
+                write_statistics=True
             )
             logger.info(f"Successfully exported {len(df)} records to Parquet")
             return output_path
@@ -381,27 +691,76 @@ class DataStorage:
             logger.error(f"Failed to export to Parquet: {e}")
             raise
 
-    def query_data(self, query: str) -> pd.DataFrame:
+    def query_data(
+        self,
+        query: str,
+        chunksize: Optional[int] = None
+    ) -> Union[pd.DataFrame, Iterator[pd.DataFrame]]:
         """
         Execute SQL query and return results as DataFrame.
 
+        Results use pyarrow-backed dtypes. Pass chunksize to process large
+        results in bounded memory:
+
+            for chunk in storage.query_data(query, chunksize=50_000):
+                ...
+
         Args:
             query: SQL query string
+            chunksize: Optional number of rows per DataFrame; when set, an
+                iterator of DataFrames is returned
 
         Returns:
-            Query results as DataFrame
+            Query results as DataFrame, or an iterator of DataFrames if chunked
         """
         engine = self.get_engine()
 
+        if chunksize is not None:
+            return self._iter_query_chunks(query, chunksize)
+
         try:
-            df = pd.read_sql(query, engine)
+            df = pd.read_sql(text(query), engine, dtype_backend='pyarrow')
             return df
         except Exception as e:
             logger.error(f"Query failed: {e}")
             raise
 
+    def _iter_query_chunks(self, query: str, chunksize: int) -> Iterator[pd.DataFrame]:
+        """
+        Yield query results in DataFrames of up to chunksize rows.
+
+        Uses a server-side cursor (stream_results) so the driver does not
+        buffer the full result set client-side.
+
+        Args:
+            query: SQL query string
+            chunksize: Number of rows per DataFrame
+
+        Yields:
+            DataFrame chunks
+        """
+        engine = self.get_engine()
+
+        try:
+            with engine.connect().execution_options(stream_results=True) as conn:
+                yield from pd.read_sql(
+                    text(query),
+                    conn,
+                    chunksize=chunksize,
+                    dtype_backend='pyarrow'
+                )
+        except Exception as e:
+            logger.error(f"Query failed: {e}")
+            raise
+
     def close(self) -> None:
         """Close database connection."""
         if self.engine:
             self.engine.dispose()
             logger.info("Database connection closed")
+
+    async def close_async(self) -> None:
+        """Close async database connection."""
+        if self.async_engine:
+            await self.async_engine.dispose()
+            logger.info("Async database connection closed")
@@ -0,0 +1,34 @@
+"""Tests for shared transformer helpers in datasets/base.py."""
+
+import pytest
+
+from datasets.base import _to_snake_case
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("Unemployment Rate (%)", "unemployment_rate"),
+    ("Year-Month", "year_month"),
+    ("  NTA  Code ", "nta_code"),
+    ("supply_gap__lbs", "supply_gap_lbs"),
+    ("already_snake", "already_snake"),
+])
+def test_to_snake_case_ascii(name, expected):
+    assert _to_snake_case(name) == expected
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("Año – Total", "año_total"),
+    ("Café Count", "café_count"),
+    ("Rate “Adjusted”", "rate_adjusted"),
+])
+def test_to_snake_case_non_ascii(name, expected):
+    assert _to_snake_case(name) == expected
+
+
+@pytest.mark.parametrize("name, expected", [
+    (2023, "2023"),
+    (1.5, "1_5"),
+    (None, "none"),
+])
+def test_to_snake_case_non_string_labels(name, expected):
+    assert _to_snake_case(name) == expected
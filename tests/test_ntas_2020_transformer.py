@@ -0,0 +1,75 @@
+"""Tests for the NTA 2020 geometry conversion."""
+
+import logging
+
+import pandas as pd
+import pytest
+import shapely
+from geoalchemy2.shape import to_shape
+
+import datasets.ntas_2020.transformer as ntas_transformer
+from datasets.ntas_2020.transformer import GEOMETRY_SRID, Ntas2020Transformer
+
+SQUARE = {
+    "type": "MultiPolygon",
+    "coordinates": [[[[0, 0], [1, 0], [1, 1], [0, 1], [0, 0]]]],
+}
+
+
+@pytest.fixture
+def transformer():
+    # _convert_geometry_batch does not depend on the dataset config
+    return Ntas2020Transformer.__new__(Ntas2020Transformer)
+
+
+def test_convert_geometry_batch_dict_and_string(transformer):
+    geoms = pd.Series([SQUARE, '{"type": "Point", "coordinates": [2, 3]}'])
+
+    elements = transformer._convert_geometry_batch(geoms)
+
+    assert [element.srid for element in elements] == [GEOMETRY_SRID, GEOMETRY_SRID]
+    assert all(element.extended for element in elements)
+    assert to_shape(elements[0]).equals(shapely.geometry.shape(SQUARE))
+    assert to_shape(elements[1]).wkt == "POINT (2 3)"
+
+
+def test_convert_geometry_batch_missing_and_invalid(transformer, caplog):
+    geoms = pd.Series([None, float("nan"), "", "{}", "not geojson", SQUARE])
+
+    with caplog.at_level(logging.WARNING):
+        elements = transformer._convert_geometry_batch(geoms)
+
+    assert elements[:5] == [None] * 5
+    assert elements[5] is not None
+    # Only the unparseable value counts as a failure, missing ones are expected
+    warnings = [r.getMessage() for r in caplog.records if r.levelno == logging.WARNING]
+    assert warnings == ["Failed to convert 1 geometries"]
+
+
+def test_convert_geometry_batch_parallel_matches_serial(transformer, monkeypatch):
+    geoms = pd.Series(
+        [
+            {"type": "Point", "coordinates": [i, i + 0.5]} if i % 7 else "not geojson"
+            for i in range(50)
+        ]
+        + [None]
+    )
+    serial = transformer._convert_geometry_batch(geoms)
+
+    pools = []
+    real_executor = ntas_transformer.ThreadPoolExecutor
+
+    def recording_executor(*args, **kwargs):
+        pools.append(kwargs.get("max_workers"))
+        return real_executor(*args, **kwargs)
+
+    monkeypatch.setattr(ntas_transformer, "PARALLEL_GEOMETRY_THRESHOLD", 0)
+    monkeypatch.setattr(ntas_transformer.os, "cpu_count", lambda: 4)
+    monkeypatch.setattr(ntas_transformer, "ThreadPoolExecutor", recording_executor)
+    parallel = transformer._convert_geometry_batch(geoms)
+
+    assert pools == [4]
+    assert len(parallel) == len(serial)
+    assert [e.desc if e is not None else None for e in parallel] == [
+        e.desc if e is not None else None for e in serial
+    ]
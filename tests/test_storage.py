@@ -0,0 +1,37 @@
+"""Tests for DataStorage helpers that do not need a database."""
+
+import numpy as np
+import pandas as pd
+
+from src.ingestion.storage import DataStorage
+
+
+def test_iter_record_batches_splits_rows():
+    df = pd.DataFrame({"a": range(5), "b": list("vwxyz")})
+
+    batches = list(DataStorage._iter_record_batches(df, batch_size=2))
+
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert batches[0][0] == {"a": 0, "b": "v"}
+    assert batches[2][0] == {"a": 4, "b": "z"}
+
+
+def test_iter_record_batches_missing_values_become_none():
+    df = pd.DataFrame({
+        "float": [1.5, np.nan],
+        "nullable_int": pd.array([1, pd.NA], dtype="Int64"),
+        "timestamp": [pd.Timestamp("2024-01-01"), pd.NaT],
+        "text": ["x", None],
+    })
+
+    (batch,) = DataStorage._iter_record_batches(df, batch_size=10)
+
+    assert batch[1] == {"float": None, "nullable_int": None, "timestamp": None, "text": None}
+    assert batch[0]["float"] == 1.5
+    assert batch[0]["nullable_int"] == 1
+
+
+def test_iter_record_batches_empty_frame():
+    df = pd.DataFrame({"a": pd.Series([], dtype="int64")})
+
+    assert list(DataStorage._iter_record_batches(df, batch_size=10)) == []